@@ -0,0 +1,74 @@
+# Server-side comparison of the JSON and binary history payloads: payload size,
+# encoding as /api/values does it (jsonify vs encode_history) and decoding in
+# Python. The decode column is only a Python reference, it does not measure
+# the dashboard's fromJson / decodeHistory in a browser, so these numbers are
+# not end-to-end timings.
+import datetime
+import json
+import time
+from random import randint
+
+from flask import Flask, jsonify
+
+from history_format import decode_history, encode_history
+
+# Bare application, only used for jsonify's serialization settings
+app = Flask(__name__)
+
+# History window sizes (points per series) to compare
+WINDOWS = [50, 5000, 500000]
+SERIES = ['machine1.temperature', 'machine1.pressure', 'machine2.temperature', 'machine2.pressure']
+
+
+def make_window(points):
+    start = datetime.datetime.now() - datetime.timedelta(seconds=points)
+    times = [start + datetime.timedelta(seconds=i) for i in range(points)]
+    data = {}
+    for name in SERIES:
+        values = [randint(10, 999) for _ in range(points)]
+        data[name] = {
+            'current': values[-1],
+            'history': [{'value': v, 'timestamp': t.isoformat()} for v, t in zip(values, times)],
+            'values': values,
+            'times': [t.timestamp() * 1000 for t in times]
+        }
+    return data
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def decode_json(payload):
+    # Python counterpart of the dashboard work: parse the payload and every ISO timestamp
+    data = json.loads(payload)
+    for series in data.values():
+        for h in series['history']:
+            datetime.datetime.fromisoformat(h['timestamp']).timestamp()
+    return data
+
+
+def main():
+    print(f"{'points':>8} {'format':>7} {'bytes':>12} {'B/point':>8} {'encode ms':>10} {'py decode ms':>13}")
+    for points in WINDOWS:
+        data = make_window(points)
+        total = points * len(SERIES)
+
+        json_data = {name: {'current': s['current'], 'history': s['history']} for name, s in data.items()}
+        with app.app_context():
+            payload, encode_ms = timed(lambda: jsonify(json_data).get_data())
+        _, decode_ms = timed(decode_json, payload)
+        print(f"{points:>8} {'json':>7} {len(payload):>12} {len(payload) / total:>8.1f} "
+              f"{encode_ms:>10.2f} {decode_ms:>13.2f}")
+
+        series = [(name, s['current'], s['values'], s['times']) for name, s in data.items()]
+        payload, encode_ms = timed(encode_history, series, time.time() * 1000)
+        _, decode_ms = timed(decode_history, payload)
+        print(f"{points:>8} {'binary':>7} {len(payload):>12} {len(payload) / total:>8.1f} "
+              f"{encode_ms:>10.2f} {decode_ms:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import tempfile
+
+from opcua import ua
+
+logger = logging.getLogger(__name__)
+
+# Default location of the on-disk NodeId cache
+DEFAULT_CACHE_FILE = ".nodeid_cache.json"
+
+# Namespace of the TENEZEU information model (model.xml)
+MODEL_NAMESPACE_URI = "http://yourorganisation.org/TENEZEU/"
+
+# Upper bound of browse paths sent in a single TranslateBrowsePathsToNodeIds
+# request, most servers reject larger requests (MaxNodesPerTranslateBrowsePathsToNodeIds)
+TRANSLATE_BATCH_SIZE = 1000
+
+
+def _split_path(path, default_idx):
+    """Turn 'AssemblyLine/2:Machine1/...' into a list of QualifiedName"""
+    names = []
+    for segment in path.strip("/").split("/"):
+        idx, sep, name = segment.partition(":")
+        if sep and idx.isdigit():
+            names.append(ua.QualifiedName(name, int(idx)))
+        else:
+            names.append(ua.QualifiedName(segment, default_idx))
+    return names
+
+
+def _browse_path(names):
+    browse_path = ua.BrowsePath()
+    browse_path.StartingNode = ua.NodeId(ua.ObjectIds.ObjectsFolder)
+    for name in names:
+        element = ua.RelativePathElement()
+        element.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HierarchicalReferences)
+        element.IsInverse = False
+        element.IncludeSubtypes = True
+        element.TargetName = name
+        browse_path.RelativePath.Elements.append(element)
+    return browse_path
+
+
+def _version_names(namespace_uri, idx):
+    # Objects/Server/Namespaces/<uri>/NamespaceVersion (NamespaceMetadataType)
+    return [
+        ua.QualifiedName("Server", 0),
+        ua.QualifiedName("Namespaces", 0),
+        ua.QualifiedName(namespace_uri, idx),
+        ua.QualifiedName("NamespaceVersion", 0),
+    ]
+
+
+def _translate(client, names_list):
+    """Resolve browse paths in as few TranslateBrowsePathsToNodeIds calls as possible.
+
+    Returns the list of matching NodeId strings per entry, empty when the path does not exist.
+    """
+    targets = []
+    for start in range(0, len(names_list), TRANSLATE_BATCH_SIZE):
+        chunk = names_list[start:start + TRANSLATE_BATCH_SIZE]
+        results = client.uaclient.translate_browsepaths_to_nodeids([_browse_path(names) for names in chunk])
+        for result in results:
+            if result.StatusCode.is_good():
+                targets.append([ua.NodeId(target.TargetId.Identifier, target.TargetId.NamespaceIndex).to_string()
+                                for target in result.Targets])
+            else:
+                targets.append([])
+    return targets
+
+
+def _load_cache(cache_file):
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_cache(cache_file, cache):
+    # Unique temp file per writer, several clients may share the same cache file
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cache_file) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Could not write NodeId cache {cache_file}: {e}")
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def _read_values(client, node_ids):
+    """Read the Value attribute of several nodes in a single Read request, None on bad status"""
+    results = client.uaclient.get_attributes(node_ids, ua.AttributeIds.Value)
+    return [result.Value.Value if result.StatusCode.is_good() else None for result in results]
+
+
+def resolve_nodes(client, paths, namespace_uri=MODEL_NAMESPACE_URI, cache_file=DEFAULT_CACHE_FILE):
+    """Resolve browse paths (relative to the Objects folder) to client nodes.
+
+    Path segments without an explicit 'idx:' prefix belong to namespace_uri.
+    Resolved NodeIds are cached on disk and reused as long as the server's
+    namespace array and model version (NamespaceVersion) are unchanged, a warm
+    start costs a single Read. A cold start costs a Read, the batched
+    TranslateBrowsePathsToNodeIds and a Read of the model version.
+    Servers without a model version are never cached: their NodeIds may change
+    without any change of the namespace array.
+    Raises KeyError if a path does not exist on the server or matches several nodes.
+    """
+    cache = _load_cache(cache_file)
+    entry = cache.get(client.server_url.geturl(), {})
+    version_node = entry.get("version_node")
+
+    # Namespace array and cached model version in one Read
+    node_ids = [ua.NodeId(ua.ObjectIds.Server_NamespaceArray)]
+    if version_node:
+        node_ids.append(ua.NodeId.from_string(version_node))
+    values = _read_values(client, node_ids)
+    namespace_array = list(values[0])
+    model_version = values[1] if version_node else None
+
+    if namespace_uri not in namespace_array:
+        raise KeyError(f"Namespace {namespace_uri} is not registered on the server")
+    idx = namespace_array.index(namespace_uri)
+
+    if (model_version is None or entry.get("namespace_array") != namespace_array
+            or entry.get("model_version") != model_version):
+        if entry:
+            logger.info("Server namespaces or model version changed, NodeId cache invalidated")
+        entry = {"namespace_array": namespace_array, "model_version": None, "nodes": {}}
+
+    nodes = entry["nodes"]
+    missing = [path for path in paths if path not in nodes]
+    if missing:
+        names_list = [_split_path(path, idx) for path in missing]
+        resolve_version = entry["model_version"] is None
+        if resolve_version:
+            names_list.append(_version_names(namespace_uri, idx))
+
+        targets = _translate(client, names_list)
+        if resolve_version:
+            version_targets = targets.pop()
+            entry["version_node"] = version_targets[0] if len(version_targets) == 1 else None
+            if entry["version_node"]:
+                entry["model_version"] = _read_values(client, [ua.NodeId.from_string(entry["version_node"])])[0]
+
+        # A path must designate exactly one node, nothing is cached otherwise
+        unresolved = [path for path, found in zip(missing, targets) if not found]
+        if unresolved:
+            raise KeyError(f"Browse paths not found on server: {', '.join(unresolved)}")
+        ambiguous = [path for path, found in zip(missing, targets) if len(found) > 1]
+        if ambiguous:
+            raise KeyError(f"Browse paths matching several nodes on server: {', '.join(ambiguous)}")
+        nodes.update((path, found[0]) for path, found in zip(missing, targets))
+        logger.info(f"Resolved {len(missing)} browse paths, {len(paths) - len(missing)} from cache")
+
+        if entry["model_version"] is not None:
+            cache[client.server_url.geturl()] = entry
+            _save_cache(cache_file, cache)
+        else:
+            logger.info(f"No NamespaceVersion for {namespace_uri}, NodeIds are not cached")
+
+    return {path: client.get_node(nodes[path]) for path in paths}
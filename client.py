@@ -2,6 +2,10 @@ import time
 
 from opcua import Client
 
+from browse_cache import resolve_nodes
+
+PATHS = ["Parameters/Timestamp", "Parameters/Temperature", "Parameters/Pressure"]
+
 try:
     # Create client instance
     url = "opc.tcp://192.168.1.45:4840"  # 's IP address
@@ -11,12 +15,11 @@ try:
     client.connect()
     print("Client connected to:", url)
 
-    # Get the root node
-    objects = client.get_root_node()
-
-    timestamp = client.get_node("ns=2;i=2")  # Numeric2 for Timestamp
-    temperature = client.get_node("ns=2;i=3")  # Numeric3 for Temperature
-    pressure = client.get_node("ns=2;i=4")  # Numeric4 for Pressure
+    # Get the nodes by browse path (see browse_cache.resolve_nodes)
+    nodes = resolve_nodes(client, PATHS, namespace_uri="OPCUA_RPI_TENEZEU")
+    timestamp = nodes["Parameters/Timestamp"]
+    temperature = nodes["Parameters/Temperature"]
+    pressure = nodes["Parameters/Pressure"]
 
     # Main loop to read values
     while True:
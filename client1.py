@@ -4,6 +4,10 @@ from datetime import datetime
 
 from opcua import Client
 
+from browse_cache import resolve_nodes
+
+PATHS = ["Parameters/Timestamp", "Parameters/Temperature", "Parameters/Pressure"]
+
 
 def write_values(temperature_node, pressure_node, timestamp_node):
     """Function to write new values to the server"""
@@ -38,10 +42,11 @@ try:
     client.connect()
     print("Client connected to:", url)
 
-    # Get the nodes using the numeric identifiers
-    timestamp = client.get_node("ns=2;i=2")  # Numeric2 for Timestamp
-    temperature = client.get_node("ns=2;i=3")  # Numeric3 for Temperature
-    pressure = client.get_node("ns=2;i=4")  # Numeric4 for Pressure
+    # Get the nodes by browse path (see browse_cache.resolve_nodes)
+    nodes = resolve_nodes(client, PATHS, namespace_uri="OPCUA_RPI_TENEZEU")
+    timestamp = nodes["Parameters/Timestamp"]
+    temperature = nodes["Parameters/Temperature"]
+    pressure = nodes["Parameters/Pressure"]
 
     while True:
         try:
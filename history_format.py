@@ -0,0 +1,84 @@
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+# Media type of the compact history payload, requested through the Accept header
+HISTORY_MIME = 'application/x-opcua-history'
+
+# Layout (little-endian, every block starts on an 8-byte boundary so the
+# browser can view values as Float64Array / deltas as Int32Array without copying):
+#   header:  magic 'OPH1', uint32 series count, float64 last update (epoch ms)
+#   series:  uint16 name length, utf-8 name, padding
+#            float64 current, float64 base epoch ms, uint32 n, uint32 padding
+#            float64[n] values
+#            int32[n] timestamp deltas in ms (first relative to base), padding
+# Consecutive timestamps must therefore be less than 2**31 ms (~24.8 days) apart.
+MAGIC = b'OPH1'
+_HEADER = struct.Struct('<4sId')
+_SERIES = struct.Struct('<ddII')
+_INT32_MAX = 2 ** 31 - 1
+
+
+def _pad(size):
+    return b'\0' * (-size % 8)
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def encode_history(series, last_update_ms):
+    """Encode [(name, current, values, times_ms), ...] into the binary history format.
+
+    Raises ValueError when a series cannot be represented (mismatched lengths,
+    timestamp gap outside the int32 delta range), callers fall back to JSON.
+    """
+    parts = [_HEADER.pack(MAGIC, len(series), last_update_ms)]
+    for name, current, values, times_ms in series:
+        if len(values) != len(times_ms):
+            raise ValueError(f"Series {name}: {len(values)} values but {len(times_ms)} timestamps")
+        name = name.encode('utf-8')
+        parts.append(struct.pack('<H', len(name)) + name + _pad(2 + len(name)))
+
+        # Timestamps are kept at millisecond resolution
+        times_ms = [round(t) for t in times_ms]
+        base = times_ms[0] if times_ms else 0
+        deltas = [b - a for a, b in zip([base] + times_ms, times_ms)]
+        if deltas and max(abs(min(deltas)), max(deltas)) > _INT32_MAX:
+            raise ValueError(f"Series {name}: timestamp gap does not fit an int32 delta")
+        deltas = array('i', deltas)
+        parts.append(_SERIES.pack(current, base, len(values), 0))
+        parts.append(_little_endian(array('d', values)))
+        parts.append(_little_endian(deltas) + _pad(4 * len(deltas)))
+    return b''.join(parts)
+
+
+def decode_history(data):
+    """Decode a binary history payload into (last_update_ms, {name: (current, values, times_ms)})"""
+    magic, count, last_update_ms = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a binary history payload")
+    offset = _HEADER.size
+    series = {}
+    for _ in range(count):
+        (name_length,) = struct.unpack_from('<H', data, offset)
+        name = bytes(data[offset + 2:offset + 2 + name_length]).decode('utf-8')
+        offset += 2 + name_length + len(_pad(2 + name_length))
+
+        current, base, n, _ = _SERIES.unpack_from(data, offset)
+        offset += _SERIES.size
+        values = array('d', data[offset:offset + 8 * n])
+        offset += 8 * n
+        deltas = array('i', data[offset:offset + 4 * n])
+        offset += 4 * n + len(_pad(4 * n))
+        if sys.byteorder != 'little':
+            values.byteswap()
+            deltas.byteswap()
+
+        times_ms = array('d', accumulate(deltas, initial=base))[1:]
+        series[name] = (current, values, times_ms)
+    return last_update_ms, series
+
@@ -0,0 +1,122 @@
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from logging.handlers import RotatingFileHandler
+
+# Tracing spans go to their own logger so they never mix with the application log
+trace_logger = logging.getLogger("opcua.trace")
+trace_logger.propagate = False
+_tracing_enabled = False
+_NO_SPAN = nullcontext()
+
+
+def enable_tracing(path='opcua_trace.jsonl'):
+    """Write every span as one JSON line to path (rotated like opcua_server.log)"""
+    global _tracing_enabled
+    if not trace_logger.handlers:
+        handler = RotatingFileHandler(path, maxBytes=1024 * 1024, backupCount=5)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        trace_logger.addHandler(handler)
+        trace_logger.setLevel(logging.INFO)
+    _tracing_enabled = True
+
+
+def disable_tracing():
+    """Stop exporting spans, the trace file is kept for the next enable_tracing()"""
+    global _tracing_enabled
+    _tracing_enabled = False
+
+
+def tracing_enabled():
+    return _tracing_enabled
+
+
+def span(name):
+    """Time the enclosed block and export it as a span when tracing is enabled.
+
+    While tracing is disabled this is a flag check returning a shared no-op
+    context manager.
+    """
+    if not _tracing_enabled:
+        return _NO_SPAN
+    return _traced_span(name)
+
+
+@contextmanager
+def _traced_span(name):
+    start_wall = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        trace_logger.info(json.dumps({
+            'name': name,
+            'start': start_wall,
+            'duration_ms': round(duration_ms, 3),
+            'thread': threading.current_thread().name
+        }))
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of all threads from a background thread.
+
+    Samples are aggregated as collapsed stacks ("frame;frame;frame count"),
+    the input format of flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self._samples = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if not self.running:
+            return False
+        self._stop.set()
+        self._thread.join()
+        return True
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                stacks.append(';'.join(reversed(stack)))
+            with self._lock:
+                self._samples.update(stacks)
+
+    def collapsed(self, reset=False):
+        """Return the samples in collapsed stack format"""
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self._samples.most_common()]
+            if reset:
+                self._samples.clear()
+        return '\n'.join(lines) + '\n' if lines else ''
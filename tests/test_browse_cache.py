@@ -0,0 +1,133 @@
+import json
+from urllib.parse import urlparse
+
+import pytest
+from opcua import ua
+
+from browse_cache import MODEL_NAMESPACE_URI, resolve_nodes
+
+NAMESPACES = ["http://opcfoundation.org/UA/", "urn:freeopcua:python:server", MODEL_NAMESPACE_URI]
+VERSION_PATH = ("0:Server", "0:Namespaces", f"2:{MODEL_NAMESPACE_URI}", "0:NamespaceVersion")
+VALEUR_PATH = ("2:AssemblyLine", "2:Machine1", "2:SensorTemp", "2:Valeur")
+PATHS = ["AssemblyLine/Machine1/SensorTemp/Valeur"]
+
+
+class StubUaClient:
+    """Answers Read and TranslateBrowsePathsToNodeIds from dicts and counts the requests"""
+
+    def __init__(self, namespaces=NAMESPACES, version="1.0.0", targets=None):
+        self.values = {ua.NodeId(ua.ObjectIds.Server_NamespaceArray).to_string(): namespaces}
+        self.targets = {VALEUR_PATH: ["ns=2;i=6010"]} if targets is None else targets
+        if version is not None:
+            self.values["ns=2;i=6018"] = version
+            self.targets[VERSION_PATH] = ["ns=2;i=6018"]
+        self.reads = 0
+        self.translates = 0
+
+    def get_attributes(self, node_ids, attribute):
+        self.reads += 1
+        results = []
+        for node_id in node_ids:
+            key = node_id.to_string()
+            if key in self.values:
+                results.append(ua.DataValue(ua.Variant(self.values[key])))
+            else:
+                result = ua.DataValue()
+                result.StatusCode = ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)
+                results.append(result)
+        return results
+
+    def translate_browsepaths_to_nodeids(self, browse_paths):
+        self.translates += 1
+        results = []
+        for browse_path in browse_paths:
+            path = tuple(f"{element.TargetName.NamespaceIndex}:{element.TargetName.Name}"
+                         for element in browse_path.RelativePath.Elements)
+            result = ua.BrowsePathResult()
+            for node_id in self.targets.get(path, []):
+                target = ua.BrowsePathTarget()
+                target.TargetId = ua.NodeId.from_string(node_id)
+                result.Targets.append(target)
+            if not result.Targets:
+                result.StatusCode = ua.StatusCode(ua.StatusCodes.BadNoMatch)
+            results.append(result)
+        return results
+
+
+class StubClient:
+    def __init__(self, uaclient):
+        self.uaclient = uaclient
+        self.server_url = urlparse("opc.tcp://127.0.0.1:4840")
+
+    def get_node(self, node_id):
+        return node_id
+
+
+def resolve(uaclient, cache_file):
+    return resolve_nodes(StubClient(uaclient), PATHS, cache_file=str(cache_file))
+
+
+def test_cold_start_translates_and_persists(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    uaclient = StubUaClient()
+
+    assert resolve(uaclient, cache_file) == {PATHS[0]: "ns=2;i=6010"}
+    # Namespace array, translate, version read
+    assert (uaclient.reads, uaclient.translates) == (2, 1)
+    entry = json.loads(cache_file.read_text())["opc.tcp://127.0.0.1:4840"]
+    assert entry["model_version"] == "1.0.0"
+    assert entry["nodes"] == {PATHS[0]: "ns=2;i=6010"}
+
+
+def test_warm_start_is_a_single_read(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    resolve(StubUaClient(), cache_file)
+
+    uaclient = StubUaClient()
+    assert resolve(uaclient, cache_file) == {PATHS[0]: "ns=2;i=6010"}
+    assert (uaclient.reads, uaclient.translates) == (1, 0)
+
+
+@pytest.mark.parametrize("changed", [
+    {"version": "1.1.0"},
+    {"namespaces": NAMESPACES + ["urn:other"]},
+])
+def test_cache_invalidated_on_key_change(tmp_path, changed):
+    cache_file = tmp_path / "cache.json"
+    resolve(StubUaClient(), cache_file)
+
+    uaclient = StubUaClient(targets={VALEUR_PATH: ["ns=2;i=7000"]}, **changed)
+    assert resolve(uaclient, cache_file) == {PATHS[0]: "ns=2;i=7000"}
+    assert uaclient.translates == 1
+    assert json.loads(cache_file.read_text())["opc.tcp://127.0.0.1:4840"]["nodes"] == {PATHS[0]: "ns=2;i=7000"}
+
+
+def test_unversioned_server_is_not_cached(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    uaclient = StubUaClient(version=None)
+
+    assert resolve(uaclient, cache_file) == {PATHS[0]: "ns=2;i=6010"}
+    assert not cache_file.exists()
+
+
+def test_ambiguous_path_raises_and_is_not_cached(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    uaclient = StubUaClient(targets={VALEUR_PATH: ["ns=2;i=6010", "ns=2;i=20"]})
+
+    with pytest.raises(KeyError, match="AssemblyLine/Machine1/SensorTemp/Valeur"):
+        resolve(uaclient, cache_file)
+    assert not cache_file.exists()
+
+
+def test_missing_path_raises(tmp_path):
+    with pytest.raises(KeyError, match="not found"):
+        resolve(StubUaClient(targets={}), tmp_path / "cache.json")
+
+
+def test_malformed_cache_file_is_ignored(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text("[1, 2]")
+    uaclient = StubUaClient()
+
+    assert resolve(uaclient, cache_file) == {PATHS[0]: "ns=2;i=6010"}
+    assert uaclient.translates == 1
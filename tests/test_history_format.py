@@ -0,0 +1,40 @@
+import pytest
+
+from history_format import decode_history, encode_history
+
+LAST_UPDATE_MS = 1730000009999.0
+
+
+@pytest.mark.parametrize("series", [
+    [],
+    [('machine1.temperature', 0, [], [])],
+    [('a', 1.5, [1.0], [1730000000000.0])],
+    [('température.é', 2, [1, 2.5, -3], [1730000000000.0, 1730000001000.0, 1730000000500.4]),
+     ('machine2.pressure', 999, [float(v) for v in range(7)], [1730000000000.0 + 1000 * i for i in range(7)])],
+], ids=["empty", "empty-series", "single-point", "non-ascii-and-padding"])
+def test_round_trip(series):
+    payload = encode_history(series, LAST_UPDATE_MS)
+    # Every block is 8-byte aligned for the dashboard's typed array views
+    assert len(payload) % 8 == 0
+
+    last_update_ms, decoded = decode_history(payload)
+    assert last_update_ms == LAST_UPDATE_MS
+    assert list(decoded) == [name for name, _, _, _ in series]
+    for name, current, values, times_ms in series:
+        assert decoded[name][0] == current
+        assert list(decoded[name][1]) == [float(v) for v in values]
+        assert list(decoded[name][2]) == [float(round(t)) for t in times_ms]
+
+
+@pytest.mark.parametrize("series", [
+    [('x', 0, [1, 2], [5])],
+    [('x', 0, [1, 2], [0, 2.0 ** 31])],
+], ids=["length-mismatch", "int32-overflow"])
+def test_unencodable_series_raise(series):
+    with pytest.raises(ValueError):
+        encode_history(series, 0)
+
+
+def test_decode_rejects_foreign_payload():
+    with pytest.raises(ValueError):
+        decode_history(b'JSON' + bytes(12))
@@ -0,0 +1,42 @@
+import threading
+import time
+
+from profiling import SamplingProfiler, span, tracing_enabled
+
+
+def test_disabled_span_is_shared_noop():
+    assert not tracing_enabled()
+    assert span('value_generation') is span('serialization')
+    with span('value_generation'):
+        pass
+
+
+def busy_marker(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_marker, args=(stop,), name='busy-worker')
+    profiler = SamplingProfiler(interval=0.001)
+    worker.start()
+    try:
+        assert profiler.start()
+        assert not profiler.start()
+        deadline = time.monotonic() + 5
+        while 'busy_marker' not in profiler.collapsed() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        assert profiler.stop()
+        stop.set()
+        worker.join()
+
+    lines = profiler.collapsed(reset=True).splitlines()
+    for line in lines:
+        # "frame;frame;frame count", the stack may contain spaces, the count is last
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) > 0
+    worker_stacks = [line for line in lines if line.startswith('busy-worker;')]
+    assert any('busy_marker (' in line for line in worker_stacks)
+    assert profiler.collapsed() == ''
@@ -0,0 +1,65 @@
+import pytest
+
+import with_flask
+from history_format import HISTORY_MIME, decode_history
+
+
+@pytest.fixture
+def client():
+    with_flask.app.config['TESTING'] = True
+    return with_flask.app.test_client()
+
+
+@pytest.mark.parametrize("accept, mimetype", [
+    (None, 'application/json'),
+    ('*/*', 'application/json'),
+    (HISTORY_MIME, HISTORY_MIME),
+    (f'{HISTORY_MIME}, application/json;q=0.9', HISTORY_MIME),
+    (f'application/json, {HISTORY_MIME};q=0.1', 'application/json'),
+])
+def test_values_negotiation(client, accept, mimetype):
+    headers = {'Accept': accept} if accept else {}
+    response = client.get('/api/values', headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+    assert 'Accept' in response.headers['Vary']
+    if mimetype == HISTORY_MIME:
+        _, series = decode_history(response.data)
+        assert set(series) == {'machine1.temperature', 'machine1.pressure',
+                               'machine2.temperature', 'machine2.pressure'}
+
+
+def test_values_fall_back_to_json(client, monkeypatch):
+    def unencodable(series, last_update_ms):
+        raise ValueError("timestamp gap does not fit an int32 delta")
+
+    monkeypatch.setattr(with_flask, 'encode_history', unencodable)
+    response = client.get('/api/values', headers={'Accept': HISTORY_MIME})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.headers['Vary']
+    assert 'machine1' in response.get_json()
+
+
+@pytest.mark.parametrize("remote_addr, token, header, status", [
+    ('10.0.0.5', None, None, 403),
+    ('10.0.0.5', 'secret', None, 403),
+    ('10.0.0.5', 'secret', 'wrong', 403),
+    ('10.0.0.5', 'secret', 'secret', 200),
+    ('127.0.0.1', None, None, 200),
+    ('::1', None, None, 200),
+    ('::ffff:127.0.0.1', None, None, 200),
+])
+def test_admin_access(client, monkeypatch, remote_addr, token, header, status):
+    monkeypatch.setitem(with_flask.app.config, 'ADMIN_TOKEN', token)
+    headers = {'X-Admin-Token': header} if header else {}
+    response = client.get('/admin/profile', headers=headers, environ_base={'REMOTE_ADDR': remote_addr})
+
+    assert response.status_code == status
+
+
+def test_public_routes_not_restricted(client):
+    response = client.get('/api/values', environ_base={'REMOTE_ADDR': '10.0.0.5'})
+    assert response.status_code == 200
@@ -1,15 +1,22 @@
+import argparse
 import datetime
+import hmac
+import ipaddress
 import logging
+import os
 import threading
 import time
 from logging.handlers import RotatingFileHandler
 from random import randint
 from threading import Lock
 
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, Response, jsonify, render_template_string, request
 from opcua import Server
 from waitress import serve
 
+from history_format import HISTORY_MIME, encode_history
+from profiling import SamplingProfiler, disable_tracing, enable_tracing, span, tracing_enabled
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,12 +30,12 @@ logger.addHandler(file_handler)
 sensor_lock = Lock()
 sensor_values = {
     'machine1': {
-        'temperature': {'current': 0, 'history': []},
-        'pressure': {'current': 0, 'history': []}
+        'temperature': {'current': 0, 'history': [], 'times': []},
+        'pressure': {'current': 0, 'history': [], 'times': []}
     },
     'machine2': {
-        'temperature': {'current': 0, 'history': []},
-        'pressure': {'current': 0, 'history': []}
+        'temperature': {'current': 0, 'history': [], 'times': []},
+        'pressure': {'current': 0, 'history': [], 'times': []}
     },
     'last_update': None
 }
@@ -39,6 +46,12 @@ MAX_HISTORY_POINTS = 50
 # Flask application
 app = Flask(__name__)
 
+# Sampling profiler, started with --profile or through /admin/profile
+profiler = SamplingProfiler()
+
+# Token accepted in the X-Admin-Token header for /admin/* from non-loopback clients
+app.config['ADMIN_TOKEN'] = os.environ.get('OPCUA_ADMIN_TOKEN')
+
 # HTML template - will be in a separate artifact
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html>
@@ -173,22 +186,74 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             m2Press: createChart('m2-press-chart', 'rgb(16, 185, 129)')
         };
 
-        function updateChart(chart, data) {
-            chart.data.labels = data.map(h => new Date(h.timestamp).toLocaleTimeString());
-            chart.data.datasets[0].data = data.map(h => h.value);
+        const HISTORY_MIME = '{{ history_mime }}';
+        const textDecoder = new TextDecoder();
+
+        // Decode the binary history payload (see history_format.py) into typed arrays
+        function decodeHistory(buffer) {
+            const view = new DataView(buffer);
+            const align8 = offset => (offset + 7) & ~7;
+            const count = view.getUint32(4, true);
+            const result = {last_update: view.getFloat64(8, true)};
+            let offset = 16;
+            for (let s = 0; s < count; s++) {
+                const nameLength = view.getUint16(offset, true);
+                const name = textDecoder.decode(new Uint8Array(buffer, offset + 2, nameLength));
+                offset = align8(offset + 2 + nameLength);
+                const current = view.getFloat64(offset, true);
+                let time = view.getFloat64(offset + 8, true);
+                const n = view.getUint32(offset + 16, true);
+                offset += 24;
+                const values = new Float64Array(buffer, offset, n);
+                offset += 8 * n;
+                const deltas = new Int32Array(buffer, offset, n);
+                offset = align8(offset + 4 * n);
+                const times = new Float64Array(n);
+                for (let i = 0; i < n; i++) {
+                    time += deltas[i];
+                    times[i] = time;
+                }
+                const [machine, sensor] = name.split('.');
+                result[machine] = result[machine] || {};
+                result[machine][sensor] = {current, values, times};
+            }
+            return result;
+        }
+
+        // Bring a JSON payload into the same shape as a decoded binary one
+        function fromJson(data) {
+            for (const machine of ['machine1', 'machine2']) {
+                for (const sensor of ['temperature', 'pressure']) {
+                    const history = data[machine][sensor].history;
+                    data[machine][sensor].values = history.map(h => h.value);
+                    data[machine][sensor].times = history.map(h => new Date(h.timestamp).getTime());
+                }
+            }
+            data.last_update = new Date(data.last_update).getTime();
+            return data;
+        }
+
+        function updateChart(chart, series) {
+            chart.data.labels = Array.from(series.times, t => new Date(t).toLocaleTimeString());
+            chart.data.datasets[0].data = series.values;
             chart.update();
         }
 
         async function fetchData() {
             try {
-                const response = await fetch('/api/values');
-                const data = await response.json();
+                const response = await fetch('/api/values', {
+                    headers: {'Accept': `${HISTORY_MIME}, application/json;q=0.9`}
+                });
+                const contentType = (response.headers.get('Content-Type') || '').split(';')[0].trim();
+                const data = contentType === HISTORY_MIME
+                    ? decodeHistory(await response.arrayBuffer())
+                    : fromJson(await response.json());
                 
                 // Update charts
-                updateChart(charts.m1Temp, data.machine1.temperature.history);
-                updateChart(charts.m1Press, data.machine1.pressure.history);
-                updateChart(charts.m2Temp, data.machine2.temperature.history);
-                updateChart(charts.m2Press, data.machine2.pressure.history);
+                updateChart(charts.m1Temp, data.machine1.temperature);
+                updateChart(charts.m1Press, data.machine1.pressure);
+                updateChart(charts.m2Temp, data.machine2.temperature);
+                updateChart(charts.m2Press, data.machine2.pressure);
                 
                 // Update current values
                 document.getElementById('m1-temp').textContent = `${data.machine1.temperature.current}°C`;
@@ -225,13 +290,61 @@ def after_request(response):
     return response
 
 
+@app.before_request
+def restrict_admin():
+    # Admin endpoints are reserved to local clients or holders of the admin token
+    if not request.path.startswith('/admin/'):
+        return None
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+        if address.is_loopback or (address.version == 6 and address.ipv4_mapped
+                                   and address.ipv4_mapped.is_loopback):
+            return None
+    except ValueError:
+        pass
+    token = app.config.get('ADMIN_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        return None
+    logger.warning(f"Rejected admin request {request.path} from {request.remote_addr}")
+    return jsonify({'error': 'forbidden'}), 403
+
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return render_template_string(HTML_TEMPLATE, history_mime=HISTORY_MIME)
+
+
+def wants_binary_history():
+    # Honours q-values, */* or a missing Accept header keeps JSON
+    return request.accept_mimetypes.best_match(['application/json', HISTORY_MIME]) == HISTORY_MIME
+
+
+def get_binary_values():
+    with sensor_lock:
+        series = [
+            (f"{machine}.{sensor}",
+             sensor_values[machine][sensor]['current'],
+             [point['value'] for point in sensor_values[machine][sensor]['history'][-MAX_HISTORY_POINTS:]],
+             sensor_values[machine][sensor]['times'][-MAX_HISTORY_POINTS:])
+            for machine in ['machine1', 'machine2']
+            for sensor in ['temperature', 'pressure']
+        ]
+    with span('serialization'):
+        try:
+            payload = encode_history(series, time.time() * 1000)
+        except ValueError as e:
+            logger.warning(f"Binary history not encodable, falling back to JSON: {e}")
+            return None
+    return Response(payload, mimetype=HISTORY_MIME, headers={'Vary': 'Accept'})
 
 
 @app.route('/api/values')
 def get_values():
+    if wants_binary_history():
+        response = get_binary_values()
+        if response is not None:
+            return response
+
     with sensor_lock:
         current_values = {
             'machine1': {
@@ -256,7 +369,33 @@ def get_values():
             },
             'last_update': datetime.datetime.now().isoformat()
         }
-    return jsonify(current_values)
+    with span('serialization'):
+        response = jsonify(current_values)
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+@app.route('/admin/profile', methods=['GET'])
+def profile_dump():
+    # Collapsed stacks, e.g. curl .../admin/profile | flamegraph.pl > flame.svg
+    reset = request.args.get('reset') == '1'
+    return Response(profiler.collapsed(reset=reset), mimetype='text/plain')
+
+
+@app.route('/admin/profile/start', methods=['POST'])
+def profile_start():
+    enable_tracing()
+    started = profiler.start()
+    logger.info("Sampling profiler started" if started else "Sampling profiler already running")
+    return jsonify({'running': profiler.running, 'tracing': tracing_enabled()})
+
+
+@app.route('/admin/profile/stop', methods=['POST'])
+def profile_stop():
+    disable_tracing()
+    if profiler.stop():
+        logger.info("Sampling profiler stopped")
+    return jsonify({'running': profiler.running, 'tracing': tracing_enabled()})
 
 
 class OPCUAServer:
@@ -266,9 +405,11 @@ class OPCUAServer:
         self._last_update = None
 
     def update_sensor_values(self, machine1_data, machine2_data):
-        timestamp = datetime.datetime.now().isoformat()
+        now = datetime.datetime.now()
+        timestamp = now.isoformat()
+        timestamp_ms = now.timestamp() * 1000
 
-        with sensor_lock:
+        with span('history_update'), sensor_lock:
             # Update Machine 1
             sensor_values['machine1']['temperature']['current'] = machine1_data['temperature']
             sensor_values['machine1']['pressure']['current'] = machine1_data['pressure']
@@ -292,9 +433,13 @@ class OPCUAServer:
             # Trim histories if needed
             for machine in ['machine1', 'machine2']:
                 for sensor in ['temperature', 'pressure']:
+                    # Epoch milliseconds alongside the ISO history, used by the binary format
+                    sensor_values[machine][sensor]['times'].append(timestamp_ms)
                     if len(sensor_values[machine][sensor]['history']) > MAX_HISTORY_POINTS:
                         sensor_values[machine][sensor]['history'] = \
                             sensor_values[machine][sensor]['history'][-MAX_HISTORY_POINTS:]
+                        sensor_values[machine][sensor]['times'] = \
+                            sensor_values[machine][sensor]['times'][-MAX_HISTORY_POINTS:]
 
             sensor_values['last_update'] = timestamp
             self._last_update = datetime.datetime.now()
@@ -313,31 +458,40 @@ class OPCUAServer:
             # Get Objects node
             objects = self.server.get_objects_node()
 
-            # Create Assembly Line instance
-            assembly_line = objects.add_object(idx, "AssemblyLine")
-
-            # Create Machine 1
-            machine1 = assembly_line.add_object(idx, "Machine1")
-            sensor_temp1 = machine1.add_object(idx, "SensorTemp")
-            self.temp1_unit = sensor_temp1.add_variable(idx, "Unite", "°C")
-            self.temp1_value = sensor_temp1.add_variable(idx, "Valeur", 0.0)
+            # Use the Assembly Line instance imported from model.xml, creating a second
+            # one would give every browse path below two matching nodes
+            assembly_line = objects.get_child(f"{idx}:AssemblyLine")
+
+            # Machine 1
+            machine1 = assembly_line.get_child(f"{idx}:Machine1")
+            sensor_temp1 = machine1.get_child(f"{idx}:SensorTemp")
+            self.temp1_unit = sensor_temp1.get_child(f"{idx}:Unite")
+            self.temp1_unit.set_value("°C")
+            self.temp1_value = sensor_temp1.get_child(f"{idx}:Valeur")
+            self.temp1_value.set_value(0.0)
             self.temp1_value.set_writable()
 
-            sensor_press1 = machine1.add_object(idx, "SensorPression")
-            self.press1_unit = sensor_press1.add_variable(idx, "Unite", "hPa")
-            self.press1_value = sensor_press1.add_variable(idx, "Valeur", 0.0)
+            sensor_press1 = machine1.get_child(f"{idx}:SensorPression")
+            self.press1_unit = sensor_press1.get_child(f"{idx}:Unite")
+            self.press1_unit.set_value("hPa")
+            self.press1_value = sensor_press1.get_child(f"{idx}:Valeur")
+            self.press1_value.set_value(0.0)
             self.press1_value.set_writable()
 
-            # Create Machine 2
-            machine2 = assembly_line.add_object(idx, "Machine2")
-            sensor_temp2 = machine2.add_object(idx, "SensorTemp")
-            self.temp2_unit = sensor_temp2.add_variable(idx, "Unite", "°C")
-            self.temp2_value = sensor_temp2.add_variable(idx, "Valeur", 0.0)
+            # Machine 2
+            machine2 = assembly_line.get_child(f"{idx}:Machine2")
+            sensor_temp2 = machine2.get_child(f"{idx}:SensorTemp")
+            self.temp2_unit = sensor_temp2.get_child(f"{idx}:Unite")
+            self.temp2_unit.set_value("°C")
+            self.temp2_value = sensor_temp2.get_child(f"{idx}:Valeur")
+            self.temp2_value.set_value(0.0)
             self.temp2_value.set_writable()
 
-            sensor_press2 = machine2.add_object(idx, "SensorPression")
-            self.press2_unit = sensor_press2.add_variable(idx, "Unite", "hPa")
-            self.press2_value = sensor_press2.add_variable(idx, "Valeur", 0.0)
+            sensor_press2 = machine2.get_child(f"{idx}:SensorPression")
+            self.press2_unit = sensor_press2.get_child(f"{idx}:Unite")
+            self.press2_unit.set_value("hPa")
+            self.press2_value = sensor_press2.get_child(f"{idx}:Valeur")
+            self.press2_value.set_value(0.0)
             self.press2_value.set_writable()
 
             logger.info(f"OPC UA Server setup completed successfully at {url}")
@@ -357,16 +511,18 @@ class OPCUAServer:
         while self.running:
             try:
                 # Generate random values
-                temp1 = randint(10, 50)
-                temp2 = randint(10, 50)
-                press1 = randint(200, 999)
-                press2 = randint(200, 999)
+                with span('value_generation'):
+                    temp1 = randint(10, 50)
+                    temp2 = randint(10, 50)
+                    press1 = randint(200, 999)
+                    press2 = randint(200, 999)
 
                 # Update OPC UA values
-                self.temp1_value.set_value(float(temp1))
-                self.temp2_value.set_value(float(temp2))
-                self.press1_value.set_value(float(press1))
-                self.press2_value.set_value(float(press2))
+                with span('address_space_write'):
+                    self.temp1_value.set_value(float(temp1))
+                    self.temp2_value.set_value(float(temp2))
+                    self.press1_value.set_value(float(press1))
+                    self.press2_value.set_value(float(press2))
 
                 # Update shared values thread-safely
                 self.update_sensor_values(
@@ -397,6 +553,16 @@ def run_server(opcua_server):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="OPC UA server with web dashboard")
+    parser.add_argument('--profile', action='store_true',
+                        help="start the sampling profiler and write tracing spans to opcua_trace.jsonl")
+    args = parser.parse_args()
+
+    if args.profile:
+        enable_tracing()
+        profiler.start()
+        logger.info("Profiling enabled, collapsed stacks available at /admin/profile")
+
     # Create and start OPC UA server in a separate thread
     opcua_server = OPCUAServer()
     opcua_thread = threading.Thread(target=run_server, args=(opcua_server,))
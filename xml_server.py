@@ -25,33 +25,42 @@ idx = server.register_namespace(uri)
 # Get Objects node
 objects = server.get_objects_node()
 
-# Create Assembly Line instance
-assembly_line = objects.add_object(idx, "AssemblyLine")
+# Use the Assembly Line instance imported from model.xml, creating a second
+# one would give every browse path below two matching nodes
+assembly_line = objects.get_child(f"{idx}:AssemblyLine")
 
-# Create Machine 1
-machine1 = assembly_line.add_object(idx, "Machine1")
+# Machine 1
+machine1 = assembly_line.get_child(f"{idx}:Machine1")
 # Machine 1 Sensors
-sensor_temp1 = machine1.add_object(idx, "SensorTemp")
-temp1_unit = sensor_temp1.add_variable(idx, "Unite", "°C")
-temp1_value = sensor_temp1.add_variable(idx, "Valeur", 0.0)
+sensor_temp1 = machine1.get_child(f"{idx}:SensorTemp")
+temp1_unit = sensor_temp1.get_child(f"{idx}:Unite")
+temp1_unit.set_value("°C")
+temp1_value = sensor_temp1.get_child(f"{idx}:Valeur")
+temp1_value.set_value(0.0)
 temp1_value.set_writable()
 
-sensor_press1 = machine1.add_object(idx, "SensorPression")
-press1_unit = sensor_press1.add_variable(idx, "Unite", "hPa")
-press1_value = sensor_press1.add_variable(idx, "Valeur", 0.0)
+sensor_press1 = machine1.get_child(f"{idx}:SensorPression")
+press1_unit = sensor_press1.get_child(f"{idx}:Unite")
+press1_unit.set_value("hPa")
+press1_value = sensor_press1.get_child(f"{idx}:Valeur")
+press1_value.set_value(0.0)
 press1_value.set_writable()
 
-# Create Machine 2
-machine2 = assembly_line.add_object(idx, "Machine2")
+# Machine 2
+machine2 = assembly_line.get_child(f"{idx}:Machine2")
 # Machine 2 Sensors
-sensor_temp2 = machine2.add_object(idx, "SensorTemp")
-temp2_unit = sensor_temp2.add_variable(idx, "Unite", "°C")
-temp2_value = sensor_temp2.add_variable(idx, "Valeur", 0.0)
+sensor_temp2 = machine2.get_child(f"{idx}:SensorTemp")
+temp2_unit = sensor_temp2.get_child(f"{idx}:Unite")
+temp2_unit.set_value("°C")
+temp2_value = sensor_temp2.get_child(f"{idx}:Valeur")
+temp2_value.set_value(0.0)
 temp2_value.set_writable()
 
-sensor_press2 = machine2.add_object(idx, "SensorPression")
-press2_unit = sensor_press2.add_variable(idx, "Unite", "hPa")
-press2_value = sensor_press2.add_variable(idx, "Valeur", 0.0)
+sensor_press2 = machine2.get_child(f"{idx}:SensorPression")
+press2_unit = sensor_press2.get_child(f"{idx}:Unite")
+press2_unit.set_value("hPa")
+press2_value = sensor_press2.get_child(f"{idx}:Valeur")
+press2_value.set_value(0.0)
 press2_value.set_writable()
 
 # Start the server